@@ -14,23 +14,190 @@ Information Retrieval (encapsulated):
   - searchsploit_examine: Read exploit source code by EDB-ID
 """
 
+import asyncio
+import csv
+import functools
+import logging
 import os
 import re
 import shlex
 import shutil
-import subprocess
-from datetime import datetime
+import signal
+import time
 from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("kali-pentest-server", host="0.0.0.0", port=3001)
 
 SCRIPTS_DIR = "/app/scripts"
 LOGS_DIR = "/app/logs"
+EXPLOITDB_DIR = "/usr/share/exploitdb"
 MAX_OUTPUT_LENGTH = 4000
 EXECUTION_TIMEOUT = 120
 INSTALL_TIMEOUT = 300
+APT_UPDATE_TTL = 3600  # seconds before the apt package index is refreshed again
+READ_CHUNK_SIZE = 4096
+KILL_GRACE = 1  # seconds for a killed process group's pipes to close
 PACKAGE_NAME_RE = re.compile(r"^[a-z0-9\-]+$")
 
+# HTTP transport tuning, overridable per deployment
+MCP_BACKLOG = int(os.getenv("MCP_BACKLOG", "2048"))
+MCP_LIMIT_CONCURRENCY = int(os.getenv("MCP_LIMIT_CONCURRENCY", "1024"))
+MCP_KEEPALIVE_TIMEOUT = int(os.getenv("MCP_KEEPALIVE_TIMEOUT", "30"))
+
+# Child-process concurrency: bursts of agent calls queue for a slot instead of
+# forking unbounded nmap/hydra processes.
+MCP_MAX_PARALLEL_EXEC = int(os.getenv("MCP_MAX_PARALLEL_EXEC", str(min((os.cpu_count() or 1) * 2, 32))))
+_exec_slots = asyncio.Semaphore(MCP_MAX_PARALLEL_EXEC)
+_apt_lock = asyncio.Lock()
+
+# Child environments, built once from the startup environment rather than
+# copying os.environ on every call.
+_EXAMINE_ENV = {**os.environ, "PAGER": "cat"}  # prevent pager from swallowing output in non-TTY
+_APT_ENV = {**os.environ, "DEBIAN_FRONTEND": "noninteractive"}
+
+# Install audit log — one handler kept open for the server's lifetime instead
+# of reopening installs.log on every write. delay=True defers the open until
+# the first install is logged.
+os.makedirs(LOGS_DIR, exist_ok=True)
+_install_handler = logging.FileHandler(os.path.join(LOGS_DIR, "installs.log"), delay=True)
+_install_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+_install_logger = logging.getLogger("installs")
+_install_logger.addHandler(_install_handler)
+_install_logger.setLevel(logging.INFO)
+_install_logger.propagate = False
+
+# time.monotonic() of the last successful `apt-get update`, None until the first one
+_last_apt_update = None
+
+
+async def _read_capped(stream, limit, tail=False):
+    """
+    Drain a child's pipe while keeping at most `limit` bytes of it.
+
+    Keeps the first `limit` bytes by default, or the last `limit` bytes when
+    `tail=True`. The pipe is always read to EOF so the child never stalls on a
+    full pipe buffer. Returns (data, truncated).
+    """
+    buf = bytearray()
+    truncated = False
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if tail:
+            buf += chunk
+            if len(buf) > limit:
+                del buf[:-limit]
+                truncated = True
+        elif len(buf) < limit:
+            room = limit - len(buf)
+            buf += chunk[:room]
+            truncated = truncated or len(chunk) > room
+        else:
+            truncated = True
+    return bytes(buf), truncated
+
+
+async def _run_process(
+    cmd, *, shell=False, timeout=EXECUTION_TIMEOUT, cwd=None, env=None,
+    limit=MAX_OUTPUT_LENGTH, tail=False,
+):
+    """
+    Spawn a child process and collect its output without blocking the event loop.
+
+    `cmd` is an argv list, or a command string when `shell=True`. Each pipe is
+    capped at `limit` bytes (see _read_capped), so memory stays bounded no
+    matter how verbose the tool is. At most MCP_MAX_PARALLEL_EXEC children run
+    at once; further calls wait for a free slot before their timeout starts.
+    Returns (returncode, stdout, stderr, out_cut, err_cut) with both streams
+    left as raw bytes; out_cut/err_cut say which of them hit the cap. The child leads its own process group; on timeout or
+    cancellation the whole group is killed before the exception propagates, so
+    pipelines and backgrounded grandchildren cannot outlive the call.
+    """
+    async with _exec_slots:
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+                start_new_session=True,
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+                start_new_session=True,
+            )
+
+        async def collect():
+            out, err = await asyncio.gather(
+                _read_capped(proc.stdout, limit, tail),
+                _read_capped(proc.stderr, limit, tail),
+            )
+            await proc.wait()
+            return out, err
+
+        finished = False
+        try:
+            (stdout, out_cut), (stderr, err_cut) = await asyncio.wait_for(collect(), timeout=timeout)
+            finished = True
+        finally:
+            if not finished:
+                # Timed out or cancelled. Killing only the shell would leave
+                # the rest of a pipeline running and holding our pipes open.
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                # With the group dead its pipes reach EOF and wait() returns
+                # promptly. On 3.11 wait() only resolves once every pipe has
+                # closed (BaseSubprocessTransport._try_finish), so a descendant
+                # that escaped the group with setsid can hold it open forever.
+                # Only in that case drop our pipe ends. The child watcher has
+                # already recorded the exit by then, so close() does not poll()
+                # the child a second time.
+                try:
+                    await asyncio.wait_for(proc.wait(), timeout=KILL_GRACE)
+                except asyncio.TimeoutError:
+                    proc._transport.close()
+
+        return proc.returncode, stdout, stderr, out_cut, err_cut
+
+
+@functools.lru_cache(maxsize=512)
+def _which_cached(name, path):
+    """shutil.which() memoized per (name, PATH) so repeated checks skip the PATH walk."""
+    return shutil.which(name, path=path)
+
+
+def _clip(data, truncated=False):
+    """
+    Decode at most MAX_OUTPUT_LENGTH bytes of child output, marking anything cut off.
+
+    Slicing before decoding means a 10 MB stream costs one 4 KB decode rather
+    than decoding everything only to throw most of it away.
+    """
+    if truncated or len(data) > MAX_OUTPUT_LENGTH:
+        return data[:MAX_OUTPUT_LENGTH].decode("utf-8", errors="replace") + "\n...(truncated)"
+    return data.decode("utf-8", errors="replace")
+
+
+def _format_output(returncode, stdout, stderr, out_cut=False, err_cut=False):
+    """Assemble the exit code / STDOUT / STDERR report, capped at MAX_OUTPUT_LENGTH."""
+    parts = [f"Exit code: {returncode}\n".encode()]
+    if stdout:
+        parts.append(b"\n--- STDOUT ---\n")
+        parts.append(stdout)
+    if stderr:
+        parts.append(b"\n--- STDERR ---\n")
+        parts.append(stderr)
+    return _clip(b"".join(parts), out_cut or err_cut)
+
 
 # ─── Dynamic Execution Tools ─────────────────────────────────
 
@@ -39,46 +206,43 @@ PACKAGE_NAME_RE = re.compile(r"^[a-z0-9\-]+$")
 def write_file(filename: str, content: str) -> str:
     """Write content to a file in /app/scripts/. Use this to deploy scripts before execution."""
     filepath = os.path.join(SCRIPTS_DIR, filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, "w") as f:
-        f.write(content)
-    os.chmod(filepath, 0o755)
+
+    # Raw fd I/O: no text-mode wrapper, and fchmod on the open fd instead of
+    # a second path lookup. fchmod is still needed because umask masks the
+    # mode passed to os.open. The directory is only created when the open
+    # fails, so the common case costs no extra stat.
+    data = memoryview(content.encode("utf-8"))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        fd = os.open(filepath, flags, 0o755)
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        fd = os.open(filepath, flags, 0o755)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+        os.fchmod(fd, 0o755)
+    finally:
+        os.close(fd)
     return f"File written: {filepath} ({len(content)} bytes)"
 
 
 @mcp.tool()
-def execute_script(filename: str, args: str = "") -> str:
-    """Execute a Python script from /app/scripts/. Optionally pass space-separated args."""
+async def execute_script(filename: str, args: str = "") -> str:
+    """Execute a Python script from /app/scripts/. Optionally pass args; shell-style quoting applies (--host "a b")."""
+    # No os.path.exists() pre-check: a missing file makes python3 exit 2 with
+    # "can't open file ..." on stderr, which is reported like any other error.
     filepath = os.path.join(SCRIPTS_DIR, filename)
-    if not os.path.exists(filepath):
-        return f"Error: File not found: {filepath}"
-
-    cmd = ["python3", filepath]
-    if args:
-        cmd.extend(args.split())
-
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=EXECUTION_TIMEOUT,
-            cwd=SCRIPTS_DIR,
-        )
-        stdout = result.stdout or ""
-        stderr = result.stderr or ""
-        output = f"Exit code: {result.returncode}\n"
-        if stdout:
-            output += f"\n--- STDOUT ---\n{stdout}"
-        if stderr:
-            output += f"\n--- STDERR ---\n{stderr}"
-
-        if len(output) > MAX_OUTPUT_LENGTH:
-            output = output[:MAX_OUTPUT_LENGTH] + "\n...(truncated)"
+        cmd = ["python3", filepath, *shlex.split(args)] if args else ["python3", filepath]
+    except ValueError as e:
+        return f"Error: Could not parse args: {e}"
 
-        return output
+    try:
+        returncode, stdout, stderr, out_cut, err_cut = await _run_process(cmd, cwd=SCRIPTS_DIR)
+        return _format_output(returncode, stdout, stderr, out_cut, err_cut)
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Error: Script timed out after {EXECUTION_TIMEOUT}s"
     except Exception as e:
         return f"Error executing script: {e}"
@@ -120,80 +284,84 @@ def _safe_command(command: str) -> str:
 
 
 @mcp.tool()
-def execute_shell_cmd(command: str) -> str:
+async def execute_shell_cmd(command: str) -> str:
     """Execute an arbitrary shell command inside the Kali container. Returns exit code, stdout, and stderr."""
+    # Fast-fail blank input without forking /bin/sh. Anything else goes to sh
+    # verbatim: only sh itself can tell whether a command's quoting is valid.
+    if not command.strip():
+        return "Error: empty command"
+
     command = _safe_command(command)
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=EXECUTION_TIMEOUT,
-            cwd=SCRIPTS_DIR,
-        )
-        stdout = result.stdout or ""
-        stderr = result.stderr or ""
-        output = f"Exit code: {result.returncode}\n"
-        if stdout:
-            output += f"\n--- STDOUT ---\n{stdout}"
-        if stderr:
-            output += f"\n--- STDERR ---\n{stderr}"
+        returncode, stdout, stderr, out_cut, err_cut = await _run_process(command, shell=True, cwd=SCRIPTS_DIR)
+        return _format_output(returncode, stdout, stderr, out_cut, err_cut)
 
-        if len(output) > MAX_OUTPUT_LENGTH:
-            output = output[:MAX_OUTPUT_LENGTH] + "\n...(truncated)"
-
-        return output
-
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Error: Command timed out after {EXECUTION_TIMEOUT}s"
     except Exception as e:
         return f"Error executing command: {e}"
 
 
 @mcp.tool()
-def manage_packages(action: str, package_name: str) -> str:
+async def manage_packages(action: str, package_name: str) -> str:
     """Manage system packages. action='check' to see if installed, action='install' to install via apt-get."""
+    global _last_apt_update
     if not PACKAGE_NAME_RE.match(package_name):
         return f"Error: Invalid package name '{package_name}'. Only [a-z0-9-] allowed."
 
     if action == "check":
-        path = shutil.which(package_name)
+        search_path = os.environ.get("PATH", "")
+        # Hits come from the cache; misses are re-checked uncached, since the
+        # package may since have been installed via execute_shell_cmd.
+        path = _which_cached(package_name, search_path) or shutil.which(package_name, path=search_path)
         if path:
             return f"INSTALLED — {package_name} found at {path}"
         return f"MISSING — {package_name} not found on PATH"
 
     elif action == "install":
-        log_path = os.path.join(LOGS_DIR, "installs.log")
-        os.makedirs(LOGS_DIR, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        try:
-            result = subprocess.run(
-                f"apt-get update && DEBIAN_FRONTEND=noninteractive apt-get install -y {package_name}",
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=INSTALL_TIMEOUT,
-            )
-            status = "SUCCESS" if result.returncode == 0 else f"FAILED (exit {result.returncode})"
-            with open(log_path, "a") as f:
-                f.write(f"[{timestamp}] INSTALL {package_name} → {status}\n")
-
-            if result.returncode == 0:
-                return f"SUCCESS — {package_name} installed"
-            else:
-                error_tail = (result.stderr or "")[-500:]
-                return f"FAILED — apt-get returned exit code {result.returncode}\n{error_tail}"
-
-        except subprocess.TimeoutExpired:
-            with open(log_path, "a") as f:
-                f.write(f"[{timestamp}] INSTALL {package_name} → TIMEOUT\n")
-            return f"Error: Installation timed out after {INSTALL_TIMEOUT}s"
-        except Exception as e:
-            with open(log_path, "a") as f:
-                f.write(f"[{timestamp}] INSTALL {package_name} → ERROR: {e}\n")
-            return f"Error installing package: {e}"
+        # apt-get holds the dpkg lock, so installs run one at a time.
+        async with _apt_lock:
+            try:
+                # Run update and install as two argv calls (no /bin/sh -c wrapper),
+                # installing only if the index refresh succeeded. The index is only
+                # refreshed once per APT_UPDATE_TTL. Only the tail of stderr is
+                # reported, so keep just the last 500 bytes.
+                returncode = 0
+                if _last_apt_update is None or time.monotonic() - _last_apt_update > APT_UPDATE_TTL:
+                    returncode, _, stderr, _, _ = await _run_process(
+                        ["apt-get", "update"],
+                        timeout=INSTALL_TIMEOUT,
+                        env=_APT_ENV,
+                        limit=500,
+                        tail=True,
+                    )
+                    if returncode == 0:
+                        _last_apt_update = time.monotonic()
+                if returncode == 0:
+                    returncode, _, stderr, _, _ = await _run_process(
+                        ["apt-get", "install", "-y", package_name],
+                        timeout=INSTALL_TIMEOUT,
+                        env=_APT_ENV,
+                        limit=500,
+                        tail=True,
+                    )
+                status = "SUCCESS" if returncode == 0 else f"FAILED (exit {returncode})"
+                if returncode == 0:
+                    _which_cached.cache_clear()
+                _install_logger.info("INSTALL %s → %s", package_name, status)
+
+                if returncode == 0:
+                    return f"SUCCESS — {package_name} installed"
+                else:
+                    error_tail = stderr.decode("utf-8", errors="replace")
+                    return f"FAILED — apt-get returned exit code {returncode}\n{error_tail}"
+
+            except asyncio.TimeoutError:
+                _install_logger.info("INSTALL %s → TIMEOUT", package_name)
+                return f"Error: Installation timed out after {INSTALL_TIMEOUT}s"
+            except Exception as e:
+                _install_logger.info("INSTALL %s → ERROR: %s", package_name, e)
+                return f"Error installing package: {e}"
 
     else:
         return f"Error: Unknown action '{action}'. Use 'check' or 'install'."
@@ -202,75 +370,140 @@ def manage_packages(action: str, package_name: str) -> str:
 # ─── Information Retrieval Tools (Encapsulated) ──────────────
 
 
+def _load_exploit_index():
+    """
+    Map EDB-ID → (title, path, codes, verified) from ExploitDB's CSV index.
+
+    Loaded once at startup so searchsploit_examine can read exploit files
+    directly instead of forking the searchsploit script, which re-parses the
+    CSV on every call. Rows without an id or file are skipped, as those IDs
+    are left to the CLI. Returns an empty dict when ExploitDB isn't installed
+    or its CSV is unreadable, leaving the CLI path to handle every lookup.
+    """
+    index = {}
+    try:
+        with open(os.path.join(EXPLOITDB_DIR, "files_exploits.csv"), newline="", errors="replace") as f:
+            for row in csv.DictReader(f):
+                # Short rows come back with None for the missing columns
+                edb_id, path = row.get("id"), row.get("file")
+                if not edb_id or not path:
+                    continue
+                index[edb_id] = (
+                    row.get("description") or "",
+                    os.path.join(EXPLOITDB_DIR, path),
+                    row.get("codes") or "",
+                    row.get("verified") or "",
+                )
+    except (OSError, csv.Error):
+        return {}
+    return index
+
+
+_exploit_index = _load_exploit_index()
+
+
 @mcp.tool()
-def searchsploit_search(query: str, exact: bool = False) -> str:
+async def searchsploit_search(query: str, exact: bool = False) -> str:
     """Search ExploitDB for exploits matching a query. Returns JSON results."""
-    sanitized_query = shlex.quote(query)
-    exact_flag = "--exact " if exact else ""
-    cmd = f"searchsploit {exact_flag}{sanitized_query} --json"
+    cmd = ["searchsploit", *(["--exact"] if exact else []), query, "--json"]
 
     try:
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=EXECUTION_TIMEOUT,
-            cwd=SCRIPTS_DIR,
-        )
-        stdout = result.stdout or ""
-        stderr = result.stderr or ""
+        returncode, stdout, stderr, out_cut, _ = await _run_process(cmd, cwd=SCRIPTS_DIR)
 
-        if result.returncode != 0:
-            return f"searchsploit error (exit {result.returncode}): {stderr[:500]}"
+        if returncode != 0:
+            return f"searchsploit error (exit {returncode}): {stderr[:500].decode('utf-8', errors='replace')}"
 
         # Return the JSON output directly (searchsploit --json produces valid JSON)
-        output = stdout.strip()
-        if len(output) > MAX_OUTPUT_LENGTH:
-            output = output[:MAX_OUTPUT_LENGTH] + "\n...(truncated)"
-        return output
+        # Only stdout is returned, so a long stderr must not mark it cut
+        return _clip(stdout.strip(), out_cut)
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Error: searchsploit timed out after {EXECUTION_TIMEOUT}s"
     except Exception as e:
         return f"Error running searchsploit: {e}"
 
 
 @mcp.tool()
-def searchsploit_examine(edb_id: str) -> str:
+async def searchsploit_examine(edb_id: str) -> str:
     """Read the source code of a specific ExploitDB exploit by its EDB-ID."""
     # Validate edb_id is numeric to prevent injection
-    if not re.match(r"^\d+$", edb_id.strip()):
+    edb_id_clean = edb_id.strip()
+    if not (edb_id_clean.isascii() and edb_id_clean.isdigit()):
         return f"Error: Invalid EDB-ID '{edb_id}'. Must be numeric."
 
-    cmd = f"searchsploit -x {edb_id.strip()}"
+    # Fast path: resolve the ID through the in-memory index and read the file
+    # ourselves. IDs missing from the index (or unreadable files) fall back to
+    # the searchsploit CLI.
+    entry = _exploit_index.get(edb_id_clean)
+    if entry is not None:
+        title, path, codes, verified = entry
+        header = (
+            f"  Exploit: {title}\n"
+            f"      URL: https://www.exploit-db.com/exploits/{edb_id_clean}\n"
+            f"     Path: {path}\n"
+            f"    Codes: {codes}\n"
+            f" Verified: {verified}\n\n"
+        ).encode()
+        # Read only the bytes that fit in the response; large exploits are
+        # never pulled into memory in full.
+        budget = max(MAX_OUTPUT_LENGTH - len(header), 0)
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                size = os.fstat(fd).st_size
+                content = os.read(fd, budget)
+            finally:
+                os.close(fd)
+        except (OSError, ValueError):  # ValueError: NUL byte in a CSV path
+            pass
+        else:
+            return _clip((header + content).strip(), truncated=size > budget)
+
+    cmd = ["searchsploit", "-x", edb_id_clean]
 
     try:
-        result = subprocess.run(
+        returncode, stdout, stderr, out_cut, _ = await _run_process(
             cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=EXECUTION_TIMEOUT,
             cwd=SCRIPTS_DIR,
-            env={**os.environ, "PAGER": "cat"},  # prevent pager from swallowing output in non-TTY
+            env=_EXAMINE_ENV,
         )
-        stdout = result.stdout or ""
-        stderr = result.stderr or ""
 
-        if result.returncode != 0:
-            return f"searchsploit examine error (exit {result.returncode}): {stderr[:500]}"
+        if returncode != 0:
+            return f"searchsploit examine error (exit {returncode}): {stderr[:500].decode('utf-8', errors='replace')}"
 
-        output = stdout.strip()
-        if len(output) > MAX_OUTPUT_LENGTH:
-            output = output[:MAX_OUTPUT_LENGTH] + "\n...(truncated)"
-        return output
+        return _clip(stdout.strip(), out_cut)
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return f"Error: searchsploit timed out after {EXECUTION_TIMEOUT}s"
     except Exception as e:
         return f"Error examining exploit: {e}"
 
 
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    import subprocess
+    import uvicorn
+
+    # Warm the page cache for searchsploit and python3 (plus ld.so caches) so
+    # the first agent call doesn't pay cold-start latency. The ExploitDB CSV
+    # itself was already read by _load_exploit_index. Failures are harmless.
+    for warmup_cmd, warmup_timeout in ((["searchsploit", "--help"], 10), (["python3", "-c", "pass"], 5)):
+        try:
+            subprocess.run(warmup_cmd, capture_output=True, timeout=warmup_timeout)
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+    # Serve the streamable-http app directly so the listen backlog, keep-alive
+    # and connection ceiling can be tuned for many concurrent agent sessions.
+    # loop="auto" picks uvloop (libuv) when installed, which dispatches
+    # subprocess pipe I/O faster than the default selector loop.
+    uvicorn.run(
+        mcp.streamable_http_app(),
+        host=mcp.settings.host,
+        port=mcp.settings.port,
+        log_level=mcp.settings.log_level.lower(),
+        loop="auto",
+        workers=1,
+        backlog=MCP_BACKLOG,
+        timeout_keep_alive=MCP_KEEPALIVE_TIMEOUT,
+        limit_concurrency=MCP_LIMIT_CONCURRENCY,
+    )
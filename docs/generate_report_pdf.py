@@ -12,25 +12,49 @@ Output:
 import json
 import re
 import os
-from datetime import datetime
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
 
+try:
+    import orjson  # optional: faster parsing of large LLM responses
+except ImportError:
+    orjson = None
+
 # ── Paths ────────────────────────────────────────────────────────────────────
 DOCS_DIR   = os.path.dirname(os.path.abspath(__file__))
 LLM_FILE   = os.path.join(DOCS_DIR, "report-llm-response.json")
 META_FILE  = os.path.join(DOCS_DIR, "report-worker-payload.json")
 
-with open(LLM_FILE)  as f: llm  = json.load(f)
-with open(META_FILE) as f: meta = json.load(f)
+def load_json(path):
+    """Parse a JSON file, using the orjson C parser when it is installed."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+llm  = load_json(LLM_FILE)
+meta = load_json(META_FILE)
 
 TARGET      = meta["target"]
 SESSION_ID  = meta["session_id"]
 COMPLETED   = meta["completed_at"]
 SHORT_SID   = SESSION_ID[:8]
+# Footer timestamp, fixed once so every page of a run shows the same minute
+GENERATED_AT = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+# Records for the Section 4 findings and Section 5.3 compliance cards
+Finding    = namedtuple("Finding", "title severity cvss address procedure risk fix")
+Compliance = namedtuple("Compliance", "regulation status score items articles")
 
 SNIPS       = llm["remediation_snippets"]
-COMPLIANCE  = llm["compliance_findings"]
+COMPLIANCE  = [
+    # score/items/articles are optional in the LLM response
+    Compliance(cf["regulation"], cf["status"], cf.get("score", 0) or 0,
+               cf.get("items", []), cf.get("articles", []))
+    for cf in llm["compliance_findings"]
+]
 PATTERNS    = llm["anti_patterns"]
 
 # ── Colour palette ───────────────────────────────────────────────────────────
@@ -53,24 +77,65 @@ C_CODE_FG   = (212, 212, 212)
 C_POS_BG    = (220, 252, 231)   # green tint — positive anti-pattern
 C_NEG_BG    = (254, 226, 226)   # red tint   — negative anti-pattern
 
+# Zebra-stripe background, indexed by a row's bool ``fill`` flag
+ROW_FILL = (C_WHITE, C_LIGHT)
+
 SEVERITY_COLOR = {
     "Critical": C_RED,
     "High":     C_ORANGE,
     "Medium":   C_YELLOW,
     "Low":      C_GREEN,
 }
+SEVERITY_BG = {
+    "Critical": C_BADGE_RED,
+    "High":     (255, 237, 213),
+    "Medium":   (254, 249, 195),
+    "Low":      C_BADGE_GRN,
+}
+# Severity cell of a numbered findings row in the executive summary table
+SEV_ROW_RE = re.compile(r"^\|\s*\d+\s*\|[^|\n]*\|[^|\n]*\|\s*(Critical|High|Medium|Low)\s*\|",
+                        re.MULTILINE | re.IGNORECASE)
 STATUS_COLOR = {
     "non_compliant": (C_RED,       C_BADGE_RED, "Non-Compliant"),
     "at_risk":       (C_ORANGE,    C_BADGE_YEL, "At Risk"),
     "compliant":     (C_GREEN,     C_BADGE_GRN, "Compliant"),
 }
 
+# ── Static report content ────────────────────────────────────────────────────
+# Fixed tables that don't depend on the target or LLM response, precomputed
+# once rather than rebuilt (and re-branched per row) while rendering.
+TOOLS_USED = [
+    ("Port & Service Identification", "nmap, httpx"),
+    ("Vulnerability Research",        "searchsploit, Nuclei"),
+    ("Exploitation",                  "Custom MCP shell tools (Kali container)"),
+    ("Credential Testing",            "Hydra, manual default credential checks"),
+]
+SEVERITY_LEVELS = [
+    # (score range, label, fg, bg, remediation note)
+    ("9.0 – 10.0", "Critical", C_RED,    SEVERITY_BG["Critical"], "Must fix immediately — highest priority"),
+    ("7.0 – 8.9",  "High",     C_ORANGE, SEVERITY_BG["High"],     "Must fix immediately"),
+    ("4.0 – 6.9",  "Medium",   C_YELLOW, SEVERITY_BG["Medium"],   "Recommended fix — medium priority"),
+    ("0.0 – 3.9",  "Low",      C_GREEN,  SEVERITY_BG["Low"],      "Address per risk appetite"),
+]
+
+# ── Layout math ──────────────────────────────────────────────────────────────
+SCORE_BAR_COLORS = (C_RED, C_YELLOW, C_GREEN)   # score < 50, < 70, otherwise
+
+def _score_bar_geom(score, width):
+    """Fill width, SCORE_BAR_COLORS index and label x-offset for a 0–100 score bar."""
+    fill_w = (score / 100) * width
+    color_idx = 0 if score < 50 else 1 if score < 70 else 2
+    return fill_w, color_idx, fill_w - 14
+
 # ── PDF class ─────────────────────────────────────────────────────────────────
 FONT_DIR = "/usr/share/fonts/truetype/dejavu/"
 
 class PentestReport(FPDF):
 
     def __init__(self):
+        # (raw args, resulting fpdf2 state) from the last call to each setter
+        self._last_font = self._last_fill = self._last_text = self._last_draw = (None, None)
+        self._badge_w = {}
         super().__init__("P", "mm", "A4")
         self.set_auto_page_break(auto=True, margin=20)
         self.set_margins(18, 18, 18)
@@ -78,7 +143,41 @@ class PentestReport(FPDF):
         self.add_font("Sans",     style="",  fname=FONT_DIR + "DejaVuSans.ttf")
         self.add_font("Sans",     style="B", fname=FONT_DIR + "DejaVuSans-Bold.ttf")
         self.add_font("Mono",     style="",  fname=FONT_DIR + "DejaVuSansMono.ttf")
-        self.add_font("Mono",     style="B", fname=FONT_DIR + "DejaVuSansMono-Bold.ttf")
+
+    # ── State setters ─────────────────────────────────────────────────────────
+    # fpdf2 only drops a duplicate color/font operator after normalising the
+    # arguments into a DeviceRGB / font lookup. Helpers here reset the same
+    # state many times per row, so compare the raw arguments first and return
+    # early. The identity check on the stored state object catches fpdf2
+    # restoring state on its own (page breaks, local_context).
+    def set_font(self, family=None, style="", size=0):
+        key = (family, style, size)
+        state = (self.current_font, self.font_size_pt, self.underline)
+        if key == self._last_font[0] and state == self._last_font[1]:
+            return
+        super().set_font(family, style, size)
+        self._last_font = (key, (self.current_font, self.font_size_pt, self.underline))
+
+    def set_fill_color(self, r, g=-1, b=-1):
+        key = (r, g, b)
+        if key == self._last_fill[0] and self.fill_color is self._last_fill[1]:
+            return
+        super().set_fill_color(r, g, b)
+        self._last_fill = (key, self.fill_color)
+
+    def set_text_color(self, r, g=-1, b=-1):
+        key = (r, g, b)
+        if key == self._last_text[0] and self.text_color is self._last_text[1]:
+            return
+        super().set_text_color(r, g, b)
+        self._last_text = (key, self.text_color)
+
+    def set_draw_color(self, r, g=-1, b=-1):
+        key = (r, g, b)
+        if key == self._last_draw[0] and self.draw_color is self._last_draw[1]:
+            return
+        super().set_draw_color(r, g, b)
+        self._last_draw = (key, self.draw_color)
 
     # ── Header / Footer ──────────────────────────────────────────────────────
     def header(self):
@@ -100,70 +199,75 @@ class PentestReport(FPDF):
         self.set_text_color(148, 163, 184)
         self.cell(0, 5,
                   f"AutoRed.AI v1.0  |  Session {SHORT_SID}  |  "
-                  f"Generated {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}",
+                  f"Generated {GENERATED_AT}",
                   align="C")
         self.set_text_color(*C_DARK)
 
     # ── Helpers ───────────────────────────────────────────────────────────────
+    @contextmanager
+    def _color_scope(self, color):
+        """Draw with text `color`, restoring the previous text color only if it changed."""
+        prev = self.text_color
+        self.set_text_color(*color)
+        try:
+            yield
+        finally:
+            if self.text_color != prev:
+                self.set_text_color(prev)
+
     def h1(self, txt):
         self.ln(4)
         self.set_fill_color(*C_BLUE_DARK)
-        self.set_text_color(*C_WHITE)
         self.set_font("Sans", "B", 13)
-        self.cell(0, 9, f"  {txt}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, fill=True)
-        self.set_text_color(*C_DARK)
+        with self._color_scope(C_WHITE):
+            self.cell(0, 9, f"  {txt}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, fill=True)
         self.ln(2)
 
     def h2(self, txt):
         self.ln(3)
         self.set_font("Sans", "B", 11)
-        self.set_text_color(*C_BLUE)
-        self.cell(0, 7, txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        with self._color_scope(C_BLUE):
+            self.cell(0, 7, txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.set_draw_color(*C_BLUE_LITE)
         self.set_line_width(0.4)
         self.line(self.get_x(), self.get_y(), self.get_x() + 174, self.get_y())
-        self.set_text_color(*C_DARK)
         self.ln(1)
 
     def h3(self, txt):
         self.ln(2)
         self.set_font("Sans", "B", 10)
-        self.set_text_color(*C_MID)
-        self.cell(0, 6, txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        self.set_text_color(*C_DARK)
+        with self._color_scope(C_MID):
+            self.cell(0, 6, txt, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
     def body(self, txt, indent=0):
         self.set_font("Sans", "", 9.5)
-        self.set_text_color(*C_MID)
         self.set_x(self.l_margin + indent)
-        self.multi_cell(0, 5.5, txt)
-        self.set_text_color(*C_DARK)
+        with self._color_scope(C_MID):
+            self.multi_cell(0, 5.5, txt)
         self.ln(1)
 
-    def kv_row(self, key, val, fill=False):
-        self.set_font("Sans", "B", 9)
-        self.set_fill_color(*C_LIGHT) if fill else self.set_fill_color(*C_WHITE)
+    def kv_row(self, key, val, fill=False, key_w=48, h=6.5, size=9):
+        self.set_font("Sans", "B", size)
+        self.set_fill_color(*ROW_FILL[fill])
         self.set_text_color(*C_MID)
-        self.cell(48, 6.5, f"  {key}", fill=True)
-        self.set_font("Sans", "", 9)
+        self.cell(key_w, h, f"  {key}", fill=True)
+        self.set_font("Sans", "", size)
         self.set_text_color(*C_DARK)
-        self.cell(0, 6.5, f"  {val}", fill=True,
+        self.cell(0, h, f"  {val}", fill=True,
                   new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
     def badge(self, txt, fg, bg):
         self.set_font("Sans", "B", 8)
         self.set_text_color(*fg)
         self.set_fill_color(*bg)
-        w = self.get_string_width(txt) + 6
+        # Badge labels come from a small fixed set and always use this font
+        w = self._badge_w.get(txt)
+        if w is None:
+            w = self._badge_w[txt] = self.get_string_width(txt) + 6
         self.cell(w, 5.5, txt, fill=True)
 
     def severity_badge(self, sev):
-        color = SEVERITY_COLOR.get(sev, C_MID)
-        bg    = (254, 226, 226) if sev == "Critical" else \
-                (255, 237, 213) if sev == "High"     else \
-                (254, 249, 195) if sev == "Medium"   else \
-                (220, 252, 231)
-        self.badge(sev, color, bg)
+        self.badge(sev, SEVERITY_COLOR.get(sev, C_MID), SEVERITY_BG.get(sev, C_LIGHT))
 
     def score_bar(self, score, width=60, height=5):
         """Render a horizontal score bar (0–100)."""
@@ -172,28 +276,37 @@ class PentestReport(FPDF):
         self.set_fill_color(*C_LIGHT)
         self.rect(x, y, width, height, "F")
         # Fill
-        fill_w = (score / 100) * width
-        color  = C_RED if score < 50 else C_YELLOW if score < 70 else C_GREEN
-        self.set_fill_color(*color)
+        fill_w, color_idx, label_dx = _score_bar_geom(score, width)
+        self.set_fill_color(*SCORE_BAR_COLORS[color_idx])
         self.rect(x, y, fill_w, height, "F")
         # Score label
         self.set_font("Sans", "B", 7.5)
-        self.set_text_color(*C_WHITE if score < 50 else C_DARK)
-        self.set_xy(x + fill_w - 14, y)
+        self.set_text_color(*C_WHITE if color_idx == 0 else C_DARK)
+        self.set_xy(x + label_dx, y)
         self.cell(14, height, f"{score}/100", align="R")
         self.set_text_color(*C_DARK)
 
     def code_block(self, code, lang=""):
-        lines = code.split("\n")
         line_h = 4.5
         pad    = 4
-        height = len(lines) * line_h + pad * 2
+        w = self.epw
+        # The code is emitted by one multi_cell, which wraps overlong lines.
+        # Mono is fixed-width, so a wrap-aware line count is only needed when
+        # some line is too wide for the block. multi_cell also reserves its
+        # cell margin on both sides, so that comes off the usable width too.
+        self.set_font("Mono", "", 8)
+        lines = code.split("\n")
+        max_chars = (w - pad * 2 - 2 * self.c_margin) / self.get_string_width("M")
+        if any(len(line) > max_chars for line in lines):
+            n_lines = len(self.wrap_lines(code, w - pad * 2))
+        else:
+            n_lines = len(lines)
+        height = n_lines * line_h + pad * 2
         available = self.h - self.b_margin - self.get_y()
         if height > available:
             self.add_page()
 
         x0, y0 = self.get_x(), self.get_y()
-        w = self.epw
 
         # Background rect
         self.set_fill_color(*C_CODE_BG)
@@ -210,9 +323,8 @@ class PentestReport(FPDF):
         self.set_font("Mono", "", 8)
         self.set_text_color(*C_CODE_FG)
         self.set_xy(x0 + pad, y0 + pad)
-        for line in lines:
-            self.set_x(x0 + pad)
-            self.cell(w - pad * 2, line_h, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.multi_cell(w - pad * 2, line_h, code, align="L",
+                        new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
         self.set_text_color(*C_DARK)
         self.set_xy(x0, y0 + height + 2)
@@ -224,14 +336,45 @@ class PentestReport(FPDF):
         self.line(self.l_margin, self.get_y(), self.l_margin + 174, self.get_y())
         self.ln(3)
 
+    def wrap_lines(self, txt, width):
+        """Lines `txt` wraps into at `width` mm in the current font."""
+        return self.multi_cell(width, 5.5, txt, dry_run=True, output="LINES")
+
+    def pattern_card(self, title, detail, fg, bg, mark):
+        """Bordered anti-pattern card; starts a new page when it won't fit."""
+        x0, y0 = self.get_x(), self.get_y()
+        # Measure height needed, at the same width the detail is drawn with
+        detail_w = 164
+        self.set_font("Sans", "", 9)
+        lines = self.wrap_lines(detail, detail_w)
+        card_h = 7 + len(lines) * 5.5 + 4
+        if self.get_y() + card_h > self.h - self.b_margin:
+            self.add_page()
+            x0, y0 = self.get_x(), self.get_y()
+        self.set_fill_color(*bg)
+        self.set_draw_color(*fg)
+        self.set_line_width(0.5)
+        self.rect(x0, y0, 174, card_h, "DF")
+        self.set_xy(x0 + 3, y0 + 2)
+        self.set_font("Sans", "B", 9.5)
+        self.set_text_color(*fg)
+        self.cell(0, 5.5, f"{mark}  {title}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.set_xy(x0 + 5, self.get_y())
+        self.set_font("Sans", "", 9)
+        self.set_text_color(*C_MID)
+        self.multi_cell(detail_w, 5.5, detail)
+        self.set_xy(x0, y0 + card_h + 3)
+        self.set_text_color(*C_DARK)
+
     def bullet(self, txt, indent=4):
         self.set_font("Sans", "", 9.5)
         self.set_text_color(*C_MID)
-        x0 = self.l_margin + indent
-        self.set_x(x0)
-        self.cell(4, 5.5, "•")
-        self.set_x(x0 + 5)
-        self.multi_cell(self.epw - indent - 5, 5.5, txt)
+        line_h = 5.5
+        self.set_x(self.l_margin + indent)
+        # The bullet cell is as wide as the hanging indent, so it leaves x
+        # where the item text starts
+        self.cell(5, line_h, "•")
+        self.multi_cell(self.epw - indent - 5, line_h, txt)
         self.set_text_color(*C_DARK)
 
 
@@ -269,20 +412,15 @@ pdf.set_xy(0, 60)
 
 # Meta table
 pdf.ln(4)
-def cover_row(k, v, fill=False):
-    pdf.set_font("Sans", "B", 9.5)
-    pdf.set_fill_color(*(C_LIGHT if fill else C_WHITE))
-    pdf.set_text_color(*C_MID)
-    pdf.cell(50, 7, f"  {k}", fill=True)
-    pdf.set_font("Sans", "", 9.5)
-    pdf.set_text_color(*C_DARK)
-    pdf.cell(0, 7, f"  {v}", fill=True, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-
-cover_row("Target",      TARGET,               False)
-cover_row("Session ID",  SESSION_ID,           True)
-cover_row("Completed",   COMPLETED,            False)
-cover_row("Engine",      "AutoRed.AI v1.0 — Claude AI + Kali MCP", True)
-cover_row("Classification", "CONFIDENTIAL",    False)
+cover_meta = [
+    ("Target",         TARGET),
+    ("Session ID",     SESSION_ID),
+    ("Completed",      COMPLETED),
+    ("Engine",         "AutoRed.AI v1.0 — Claude AI + Kali MCP"),
+    ("Classification", "CONFIDENTIAL"),
+]
+for i, (k, v) in enumerate(cover_meta):
+    pdf.kv_row(k, v, fill=(i % 2 == 1), key_w=50, h=7, size=9.5)
 
 # Vulnerability summary badges on cover
 pdf.ln(8)
@@ -291,22 +429,14 @@ pdf.set_text_color(*C_MID)
 pdf.cell(0, 6, "Findings at a Glance", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 pdf.ln(2)
 
-counts = {"Critical": 0, "High": 0, "Medium": 0, "Low": 0}
-# parse from executive_summary table in section 3
-for line in llm["executive_summary"].split("\n"):
-    for sev in counts:
-        if f"| {sev}" in line or f"| {sev.lower()}" in line.lower():
-            counts[sev] += 1
-
-# Scan remediation snippets instead for a count proxy — use fixed mock counts
-counts = {"Critical": 2, "High": 1, "Medium": 1, "Low": 0}
+# parse from executive_summary table in section 3 — one regex pass over the
+# findings rows (| No. | Target:Port | Vulnerability | Severity | CVSS |)
+counts = dict.fromkeys(SEVERITY_COLOR, 0)
+counts.update(Counter(m.capitalize() for m in SEV_ROW_RE.findall(llm["executive_summary"])))
 
 for sev, cnt in counts.items():
     color = SEVERITY_COLOR[sev]
-    bg    = (254, 226, 226) if sev == "Critical" else \
-            (255, 237, 213) if sev == "High"     else \
-            (254, 249, 195) if sev == "Medium"   else \
-            (220, 252, 231)
+    bg    = SEVERITY_BG[sev]
     pdf.set_fill_color(*bg)
     pdf.set_draw_color(*color)
     pdf.set_line_width(0.5)
@@ -371,25 +501,13 @@ pdf.body(
 )
 
 pdf.h2("2.2  Tools Used")
-tools = [
-    ("Port & Service Identification", "nmap, httpx"),
-    ("Vulnerability Research",        "searchsploit, Nuclei"),
-    ("Exploitation",                  "Custom MCP shell tools (Kali container)"),
-    ("Credential Testing",            "Hydra, manual default credential checks"),
-]
-for i, (k, v) in enumerate(tools):
+for i, (k, v) in enumerate(TOOLS_USED):
     pdf.kv_row(k, v, fill=(i % 2 == 0))
 
 pdf.h2("2.3  Vulnerability Level Definition")
-levels = [
-    ("9.0 – 10.0", "Critical", C_RED,    C_BADGE_RED),
-    ("7.0 – 8.9",  "High",     C_ORANGE, (255, 237, 213)),
-    ("4.0 – 6.9",  "Medium",   C_YELLOW, (254, 249, 195)),
-    ("0.0 – 3.9",  "Low",      C_GREEN,  C_BADGE_GRN),
-]
-for i, (score_range, label, fg, bg) in enumerate(levels):
+for i, (score_range, label, fg, bg, remediation_note) in enumerate(SEVERITY_LEVELS):
     fill = (i % 2 == 0)
-    pdf.set_fill_color(*(C_LIGHT if fill else C_WHITE))
+    pdf.set_fill_color(*ROW_FILL[fill])
     pdf.set_font("Sans", "", 9)
     pdf.set_text_color(*C_MID)
     pdf.cell(40, 6.5, f"  {score_range}", fill=True)
@@ -397,15 +515,9 @@ for i, (score_range, label, fg, bg) in enumerate(levels):
     pdf.set_font("Sans", "B", 8.5)
     pdf.set_text_color(*fg)
     pdf.cell(30, 6.5, label, fill=True)
-    pdf.set_fill_color(*(C_LIGHT if fill else C_WHITE))
+    pdf.set_fill_color(*ROW_FILL[fill])
     pdf.set_font("Sans", "", 9)
     pdf.set_text_color(*C_MID)
-    remediation_note = (
-        "Must fix immediately — highest priority" if label == "Critical" else
-        "Must fix immediately" if label == "High" else
-        "Recommended fix — medium priority" if label == "Medium" else
-        "Address per risk appetite"
-    )
     pdf.cell(0, 6.5, f"  {remediation_note}", fill=True,
              new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 pdf.set_text_color(*C_DARK)
@@ -439,23 +551,19 @@ rows = [
 ]
 for i, (no, addr, vuln, sev, cvss) in enumerate(rows):
     fill = (i % 2 == 0)
-    pdf.set_fill_color(*(C_LIGHT if fill else C_WHITE))
+    pdf.set_fill_color(*ROW_FILL[fill])
     pdf.set_font("Sans", "", 8.5)
     pdf.set_text_color(*C_MID)
-    pdf.cell(col_w[0], 6.5, f" {no}",   fill=True)
-    pdf.cell(col_w[1], 6.5, f" {addr}", fill=True)
-    pdf.cell(col_w[2], 6.5, f" {vuln}", fill=True)
+    for w, txt in zip(col_w, (no, addr, vuln)):
+        pdf.cell(w, 6.5, f" {txt}", fill=True)
     # Severity badge cell
     sev_color = SEVERITY_COLOR.get(sev, C_MID)
-    sev_bg    = (254, 226, 226) if sev == "Critical" else \
-                (255, 237, 213) if sev == "High"     else \
-                (254, 249, 195) if sev == "Medium"   else \
-                (220, 252, 231)
+    sev_bg    = SEVERITY_BG.get(sev, C_LIGHT)
     pdf.set_fill_color(*sev_bg)
     pdf.set_text_color(*sev_color)
     pdf.set_font("Sans", "B", 8)
     pdf.cell(col_w[3], 6.5, f" {sev}", fill=True)
-    pdf.set_fill_color(*(C_LIGHT if fill else C_WHITE))
+    pdf.set_fill_color(*ROW_FILL[fill])
     pdf.set_font("Sans", "B", 8.5)
     pdf.set_text_color(*C_MID)
     pdf.cell(col_w[4], 6.5, cvss, align="C", fill=True,
@@ -473,114 +581,114 @@ pdf.add_page()
 pdf.h1("4.  Test Result Description")
 
 findings = [
-    {
-        "title":    "SQL Injection on Login Endpoint",
-        "severity": "Critical",
-        "cvss":     "9.8",
-        "address":  "192.168.1.100:80/login — Apache HTTP (port 80)",
-        "procedure": (
+    Finding(
+        title="SQL Injection on Login Endpoint",
+        severity="Critical",
+        cvss="9.8",
+        address="192.168.1.100:80/login — Apache HTTP (port 80)",
+        procedure=(
             "Submitted a union-based SQL injection payload to the /login form's username parameter:\n\n"
             "  username=' UNION SELECT 1,username,password,4 FROM users-- -&password=x\n\n"
             "The server returned a 200 OK response containing user credential hashes."
         ),
-        "risk": (
+        risk=(
             "The login endpoint performs no input sanitization or parameterized queries. "
             "Successful exploitation exposes 2,847 user records and 15,203 payment records "
             "to unauthorized read access."
         ),
-        "fix": (
+        fix=(
             "Use parameterized queries or prepared statements in all database interactions. "
             "Deploy an AWS WAF rule to block SQLi patterns. "
             "Implement input validation on all user-supplied parameters."
         ),
-    },
-    {
-        "title":    "Default Credentials on Tomcat Manager",
-        "severity": "Critical",
-        "cvss":     "9.1",
-        "address":  "192.168.1.100:8080/manager/html — Apache Tomcat 9.0 (port 8080)",
-        "procedure": (
+    ),
+    Finding(
+        title="Default Credentials on Tomcat Manager",
+        severity="Critical",
+        cvss="9.1",
+        address="192.168.1.100:8080/manager/html — Apache Tomcat 9.0 (port 8080)",
+        procedure=(
             "Navigated to the Tomcat Manager web console and authenticated using "
             "factory-default credentials tomcat:tomcat. Login succeeded on the first attempt."
         ),
-        "risk": (
+        risk=(
             "With Manager access, an attacker can deploy arbitrary WAR files, achieving "
             "remote code execution on the host. No exploit is required — only the default password."
         ),
-        "fix": (
+        fix=(
             "Change all Tomcat Manager credentials immediately. "
             "Disable the Manager application in production environments. "
             "Restrict /manager by IP allowlist at the reverse proxy."
         ),
-    },
-    {
-        "title":    "Unencrypted Remote Root MySQL Access",
-        "severity": "High",
-        "cvss":     "8.6",
-        "address":  "192.168.1.100:3306/mysql — MySQL 8.0 (port 3306)",
-        "procedure": (
+    ),
+    Finding(
+        title="Unencrypted Remote Root MySQL Access",
+        severity="High",
+        cvss="8.6",
+        address="192.168.1.100:3306/mysql — MySQL 8.0 (port 3306)",
+        procedure=(
             "Connected from an external host without TLS using the root account:\n\n"
             "  mysql -h 192.168.1.100 -u root -p --ssl-mode=DISABLED\n\n"
             "Root login succeeded over an unencrypted connection."
         ),
-        "risk": (
+        risk=(
             "Allows a network-positioned attacker to read, modify, or delete all databases. "
             "Credentials can be captured via packet capture on the same subnet."
         ),
-        "fix": (
+        fix=(
             "Disable remote root login. Bind MySQL to localhost (bind-address = 127.0.0.1). "
             "Enforce TLS. Restrict port 3306 to the internal application subnet only."
         ),
-    },
-    {
-        "title":    "Missing Web Application Firewall",
-        "severity": "Medium",
-        "cvss":     "5.3",
-        "address":  "192.168.1.100:80 — Apache HTTP (port 80)",
-        "procedure": (
+    ),
+    Finding(
+        title="Missing Web Application Firewall",
+        severity="Medium",
+        cvss="5.3",
+        address="192.168.1.100:80 — Apache HTTP (port 80)",
+        procedure=(
             "Sent SQLi, XSS, and path traversal payloads to the web application. "
             "No WAF, rate limiting, or input filtering was detected — "
             "all payloads reached the application unmodified."
         ),
-        "risk": (
+        risk=(
             "All OWASP Top 10 attack patterns reach the application directly. "
             "The SQL injection in Finding 4.1 was amplified by the absence of perimeter filtering."
         ),
-        "fix": (
+        fix=(
             "Deploy AWS WAF, Cloudflare WAF, or mod_security with the OWASP Core Rule Set "
             "in front of Apache. Enable rate limiting on authentication endpoints."
         ),
-    },
+    ),
 ]
 
+# Sub-heading and Finding field for each block under a finding, in print order
+FINDING_FIELDS = (
+    ("Test Address",                 "address"),
+    ("Test Procedure",               "procedure"),
+    ("Vulnerability Risk",           "risk"),
+    ("Vulnerability Fix Suggestion", "fix"),
+)
+
 for idx, f in enumerate(findings):
-    pdf.h2(f"4.{idx+1}  {f['title']}")
+    pdf.h2(f"4.{idx+1}  {f.title}")
 
     # Severity + CVSS inline
     pdf.set_font("Sans", "", 9)
     pdf.set_text_color(*C_MID)
     pdf.cell(20, 6, "Severity:")
-    pdf.severity_badge(f["severity"])
+    pdf.severity_badge(f.severity)
     pdf.set_font("Sans", "", 9)
     pdf.set_text_color(*C_MID)
     pdf.cell(12, 6, "   CVSS:")
     pdf.set_font("Sans", "B", 9)
-    pdf.set_text_color(*SEVERITY_COLOR.get(f["severity"], C_MID))
-    pdf.cell(0, 6, f"  {f['cvss']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_text_color(*SEVERITY_COLOR.get(f.severity, C_MID))
+    pdf.cell(0, 6, f"  {f.cvss}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     pdf.set_text_color(*C_DARK)
     pdf.ln(1)
 
-    pdf.h3("Test Address")
-    pdf.body(f["address"], indent=2)
-
-    pdf.h3("Test Procedure")
-    pdf.body(f["procedure"], indent=2)
-
-    pdf.h3("Vulnerability Risk")
-    pdf.body(f["risk"], indent=2)
-
-    pdf.h3("Vulnerability Fix Suggestion")
-    pdf.body(f["fix"], indent=2)
+    for heading, key in FINDING_FIELDS:
+        pdf.h3(heading)
+        pdf.body(getattr(f, key), indent=2)
 
     if idx < len(findings) - 1:
         pdf.divider()
@@ -622,10 +730,7 @@ for rec_title, rec_body in recs:
 pdf.h2("5.3  Compliance & Audit Overview")
 # Compliance cards
 for cf in COMPLIANCE:
-    reg    = cf["regulation"]
-    status = cf["status"]
-    score  = cf.get("score", 0) or 0
-    fg, bg, label = STATUS_COLOR.get(status, (C_MID, C_LIGHT, status))
+    fg, bg, label = STATUS_COLOR.get(cf.status, (C_MID, C_LIGHT, cf.status))
 
     pdf.ln(2)
     # Card header
@@ -637,7 +742,7 @@ for cf in COMPLIANCE:
     pdf.set_font("Sans", "B", 10)
     pdf.set_text_color(*fg)
     pdf.set_xy(x0 + 2, y0 + 0.5)
-    pdf.cell(100, 6, reg)
+    pdf.cell(100, 6, cf.regulation)
     pdf.set_font("Sans", "B", 8)
     pdf.set_xy(x0 + 130, y0 + 0.5)
     pdf.cell(44, 6, label, align="R")
@@ -650,22 +755,22 @@ for cf in COMPLIANCE:
     pdf.set_text_color(*C_MID)
     pdf.cell(18, 5, "Score:")
     pdf.set_x(x0 + 20)
-    pdf.score_bar(score, width=100, height=5)
+    pdf.score_bar(cf.score, width=100, height=5)
     pdf.ln(7)
 
     # Failing items
     pdf.set_font("Sans", "", 8.5)
     pdf.set_text_color(*C_MID)
-    for item in cf.get("items", []):
+    for item in cf.items:
         pdf.bullet(item, indent=4)
     pdf.ln(1)
 
     # Articles
-    if cf.get("articles"):
+    if cf.articles:
         pdf.set_font("Sans", "", 8)
         pdf.set_text_color(100, 116, 139)
         pdf.set_x(pdf.l_margin + 4)
-        pdf.multi_cell(0, 4.5, "  References: " + "  ·  ".join(cf["articles"]))
+        pdf.multi_cell(0, 4.5, "  References: " + "  ·  ".join(cf.articles))
     pdf.ln(2)
 
 
@@ -703,54 +808,13 @@ negatives = [p for p in PATTERNS if p["type"] == "negative"]
 if positives:
     pdf.h2("Positive — Security Controls That Held")
     for p in positives:
-        x0, y0 = pdf.get_x(), pdf.get_y()
-        # Measure height needed
-        pdf.set_font("Sans", "", 9)
-        lines = pdf.multi_cell(158, 5.5, p["detail"], dry_run=True, output="LINES")
-        card_h = 7 + len(lines) * 5.5 + 4
-        if pdf.get_y() + card_h > pdf.h - pdf.b_margin:
-            pdf.add_page()
-            x0, y0 = pdf.get_x(), pdf.get_y()
-        pdf.set_fill_color(*C_POS_BG)
-        pdf.set_draw_color(*C_GREEN)
-        pdf.set_line_width(0.5)
-        pdf.rect(x0, y0, 174, card_h, "DF")
-        pdf.set_xy(x0 + 3, y0 + 2)
-        pdf.set_font("Sans", "B", 9.5)
-        pdf.set_text_color(*C_GREEN)
-        pdf.cell(0, 5.5, f"✓  {p['title']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_xy(x0 + 5, pdf.get_y())
-        pdf.set_font("Sans", "", 9)
-        pdf.set_text_color(*C_MID)
-        pdf.multi_cell(164, 5.5, p["detail"])
-        pdf.set_xy(x0, y0 + card_h + 3)
-        pdf.set_text_color(*C_DARK)
+        pdf.pattern_card(p["title"], p["detail"], C_GREEN, C_POS_BG, "✓")
 
 if negatives:
     pdf.ln(4)
     pdf.h2("Negative — Weaknesses Observed")
     for p in negatives:
-        x0, y0 = pdf.get_x(), pdf.get_y()
-        pdf.set_font("Sans", "", 9)
-        lines = pdf.multi_cell(158, 5.5, p["detail"], dry_run=True, output="LINES")
-        card_h = 7 + len(lines) * 5.5 + 4
-        if pdf.get_y() + card_h > pdf.h - pdf.b_margin:
-            pdf.add_page()
-            x0, y0 = pdf.get_x(), pdf.get_y()
-        pdf.set_fill_color(*C_NEG_BG)
-        pdf.set_draw_color(*C_RED)
-        pdf.set_line_width(0.5)
-        pdf.rect(x0, y0, 174, card_h, "DF")
-        pdf.set_xy(x0 + 3, y0 + 2)
-        pdf.set_font("Sans", "B", 9.5)
-        pdf.set_text_color(*C_RED)
-        pdf.cell(0, 5.5, f"✗  {p['title']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_xy(x0 + 5, pdf.get_y())
-        pdf.set_font("Sans", "", 9)
-        pdf.set_text_color(*C_MID)
-        pdf.multi_cell(164, 5.5, p["detail"])
-        pdf.set_xy(x0, y0 + card_h + 3)
-        pdf.set_text_color(*C_DARK)
+        pdf.pattern_card(p["title"], p["detail"], C_RED, C_NEG_BG, "✗")
 
 
 # ── Output ────────────────────────────────────────────────────────────────────
@@ -237,7 +237,7 @@ export class AgenticExecutor {
           type: 'object' as const,
           properties: {
             filename: { type: 'string', description: 'Name of the script file to execute' },
-            args: { type: 'string', description: 'Optional space-separated arguments' },
+            args: { type: 'string', description: 'Optional arguments, split with shell quoting rules (quote values containing spaces)' },
           },
           required: ['filename'],
         },